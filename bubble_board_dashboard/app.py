@@ -6,7 +6,7 @@ import streamlit as st
 from src.config import Settings, load_settings
 from src.tasks import load_tasks
 from src.stocks import get_quotes, get_sparklines
-from src.ai import get_ai_description
+from src.ai import get_ai_description, get_ai_status
 from src.ui import inject_global_css, render_header, render_filters, render_task_grid, render_task_detail
 
 st.set_page_config(
@@ -29,6 +29,13 @@ st.sidebar.code(settings.xlsx_path, language="bash")
 st.sidebar.write(f"Sheet: **{settings.sheet_name or 'auto'}**")
 st.sidebar.write(f"Priority scale: **{settings.priority_min}–{settings.priority_max}** (1 = highest)")
 
+st.sidebar.subheader("AI backends")
+for ep in get_ai_status(settings):
+    icon = "🟢" if ep["healthy"] else "🔴"
+    lat = f"{ep['ewma_latency']:.1f}s" if ep["ewma_latency"] is not None else "—"
+    cap = ep["max_concurrency"] or "∞"
+    st.sidebar.caption(f"{icon} `{ep['base_url']}` · {ep['in_flight']}/{cap} busy · avg {lat}")
+
 st.sidebar.subheader("Refresh")
 auto_refresh = st.sidebar.toggle("Auto-refresh", value=True, help="Refresh data and prices periodically.")
 refresh_sec = st.sidebar.slider("Refresh interval (seconds)", min_value=10, max_value=300, value=settings.refresh_seconds, step=10)
@@ -113,7 +120,7 @@ with tasks_col:
                     st.error(f"AI call failed: {e}")
                     st.markdown(
                         "- Verify your desktop AI server is reachable from the Pi.\n"
-                        "- Check AI_BASE_URL / AI_MODEL in .env.\n"
+                        "- Check AI_BASE_URL / AI_ENDPOINTS / AI_MODEL in .env.\n"
                         "- See README for DeepSeek server options."
                     )
     else:
@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, List, Tuple
 
 import requests
+import streamlit as st
+
+from src.ai_pool import Endpoint, EndpointPool, parse_endpoints
 
 
 def _build_prompt(item: Dict) -> str:
@@ -24,6 +27,41 @@ def _build_prompt(item: Dict) -> str:
     )
 
 
+def _endpoint_spec(settings) -> Tuple[Tuple[str, ...], int]:
+    spec = list(getattr(settings, "ai_endpoints", None) or [])
+    if not spec:
+        # Plain AI_BASE_URL setup: no client-side limit, same as before the pool existed.
+        return (settings.ai_base_url,), 0
+    return tuple(spec), getattr(settings, "ai_max_concurrency", 1)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_pool(spec: Tuple[str, ...], default_concurrency: int, api_key: str, probe_interval: int) -> EndpointPool:
+    # One pool per process so latency stats and slot counts are shared by every session.
+    pool = EndpointPool(
+        parse_endpoints(list(spec), default_concurrency),
+        api_key=api_key,
+        probe_interval=probe_interval,
+    )
+    # Find out which boxes are up before the first request (or sidebar) needs to know.
+    pool.probe_due()
+    return pool
+
+
+def get_ai_pool(settings) -> EndpointPool:
+    spec, default_concurrency = _endpoint_spec(settings)
+    return _get_pool(
+        spec,
+        default_concurrency,
+        getattr(settings, "ai_api_key", ""),
+        getattr(settings, "ai_probe_seconds", 30),
+    )
+
+
+def get_ai_status(settings) -> List[Dict]:
+    return get_ai_pool(settings).status()
+
+
 def get_ai_description(item: Dict, settings) -> str:
     """
     Calls an OpenAI-compatible local server.
@@ -31,11 +69,11 @@ def get_ai_description(item: Dict, settings) -> str:
       - Ollama (with OpenAI compatibility via /v1)
       - LM Studio (OpenAI server)
       - vLLM / llama.cpp servers that emulate OpenAI
+
+    With several AI_ENDPOINTS configured, the request goes to the least-loaded,
+    fastest healthy server and fails over to the others if it errors.
     """
-    url = settings.ai_base_url.rstrip("/") + "/chat/completions"
-    headers = {}
-    if getattr(settings, "ai_api_key", ""):
-        headers["Authorization"] = f"Bearer {settings.ai_api_key}"
+    pool = get_ai_pool(settings)
 
     payload = {
         "model": settings.ai_model,
@@ -47,8 +85,16 @@ def get_ai_description(item: Dict, settings) -> str:
         "max_tokens": 500,
     }
 
-    r = requests.post(url, headers=headers, json=payload, timeout=settings.ai_timeout_seconds)
-    r.raise_for_status()
-    data = r.json()
-    # OpenAI-style response
-    return data["choices"][0]["message"]["content"]
+    def _post(ep: Endpoint, seconds_left: float) -> str:
+        r = requests.post(
+            ep.base_url + "/chat/completions",
+            headers=pool.headers(),
+            json=payload,
+            timeout=seconds_left,
+        )
+        r.raise_for_status()
+        data = r.json()
+        # OpenAI-style response
+        return data["choices"][0]["message"]["content"]
+
+    return pool.call(_post, timeout=settings.ai_timeout_seconds)
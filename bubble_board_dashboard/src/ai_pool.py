@@ -0,0 +1,222 @@
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import requests
+
+
+# Weight given to the newest sample in the moving-average latency.
+EWMA_ALPHA = 0.3
+# /v1/models should answer fast; a box that can't is treated as down.
+PROBE_TIMEOUT_SECONDS = 3
+# Assumed latency (seconds) for endpoints before anything has been measured.
+DEFAULT_LATENCY_SECONDS = 1.0
+
+
+class NoHealthyEndpoint(RuntimeError):
+    pass
+
+
+@dataclass
+class Endpoint:
+    base_url: str
+    max_concurrency: int = 1  # 0 = no limit
+
+    in_flight: int = 0
+    ewma_latency: Optional[float] = None  # seconds; None until the first success
+    healthy: bool = True  # until the first probe says otherwise
+    next_probe_at: float = 0.0
+
+    def has_slot(self) -> bool:
+        return self.max_concurrency <= 0 or self.in_flight < self.max_concurrency
+
+    def score(self, default_latency: float) -> float:
+        # Expected wait if we queue one more request here.
+        latency = self.ewma_latency if self.ewma_latency is not None else default_latency
+        return latency * (self.in_flight + 1)
+
+    def record_success(self, seconds: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency = EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma_latency
+        self.healthy = True
+
+
+def parse_endpoints(spec: List[str], default_concurrency: int = 1) -> List[Endpoint]:
+    """
+    Each entry is `BASE_URL` or `BASE_URL|MAX_CONCURRENCY`, e.g.
+      http://192.168.1.50:11434/v1|2
+    A concurrency of 0 means no limit.
+    """
+    out: List[Endpoint] = []
+    seen = set()
+    for raw in spec:
+        raw = raw.strip()
+        if not raw:
+            continue
+        url, _, conc = raw.partition("|")
+        url = url.strip().rstrip("/")
+        if not url or url in seen:
+            continue
+        try:
+            limit = int(conc) if conc.strip() else default_concurrency
+        except ValueError:
+            limit = default_concurrency
+        out.append(Endpoint(base_url=url, max_concurrency=max(0, limit)))
+        seen.add(url)
+    return out
+
+
+def _is_down(exc: Exception) -> bool:
+    # Can't connect, or the server itself failed: the box is down, try another.
+    # A read timeout is a busy-but-alive box, and a 4xx is our request's fault.
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return isinstance(exc, requests.ConnectionError)
+
+
+class EndpointPool:
+    """
+    Routes requests across several OpenAI-compatible servers.
+
+    - Picks the free endpoint with the lowest moving-average latency x queue depth.
+    - Caps in-flight requests per endpoint; callers wait for a free slot.
+    - Marks an endpoint down on connection/5xx errors and fails over to the next.
+    - Probes every endpoint via GET {base_url}/models every `probe_interval` seconds.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], api_key: str = "", probe_interval: int = 30):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.api_key = api_key
+        self.probe_interval = probe_interval
+        self._cond = threading.Condition()
+
+    def headers(self) -> dict:
+        if self.api_key:
+            return {"Authorization": f"Bearer {self.api_key}"}
+        return {}
+
+    def probe(self, ep: Endpoint) -> bool:
+        try:
+            r = requests.get(ep.base_url + "/models", headers=self.headers(), timeout=PROBE_TIMEOUT_SECONDS)
+            ok = r.ok
+        except requests.RequestException:
+            ok = False
+        with self._cond:
+            ep.healthy = ok
+            ep.next_probe_at = time.monotonic() + self.probe_interval
+            if ok:
+                self._cond.notify_all()
+        return ok
+
+    def probe_due(self, wait: bool = True) -> None:
+        """
+        Probes every endpoint whose probe interval has passed, in parallel.
+        With wait=False the probes run in the background and the next call sees the result.
+        """
+        now = time.monotonic()
+        with self._cond:
+            due = [ep for ep in self.endpoints if ep.next_probe_at <= now]
+            for ep in due:
+                # Push the deadline out so concurrent callers don't probe the same box.
+                ep.next_probe_at = now + self.probe_interval
+        threads = [threading.Thread(target=self.probe, args=(ep,), daemon=True) for ep in due]
+        for t in threads:
+            t.start()
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _default_latency(self) -> float:
+        measured = [ep.ewma_latency for ep in self.endpoints if ep.ewma_latency is not None]
+        return sum(measured) / len(measured) if measured else DEFAULT_LATENCY_SECONDS
+
+    def _acquire(self, exclude: set, deadline: float) -> Endpoint:
+        with self._cond:
+            while True:
+                alive = [ep for ep in self.endpoints if ep.healthy and ep.base_url not in exclude]
+                if not alive:
+                    raise NoHealthyEndpoint("No AI endpoint is reachable: " + ", ".join(e.base_url for e in self.endpoints))
+                free = [ep for ep in alive if ep.has_slot()]
+                if free:
+                    default = self._default_latency()
+                    ep = min(free, key=lambda e: e.score(default))
+                    ep.in_flight += 1
+                    return ep
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("All AI endpoints are busy")
+                self._cond.wait(remaining)
+
+    def _release(self, ep: Endpoint, latency: Optional[float] = None, failed: bool = False) -> None:
+        with self._cond:
+            ep.in_flight -= 1
+            if latency is not None:
+                ep.record_success(latency)
+            if failed:
+                ep.healthy = False
+                ep.next_probe_at = time.monotonic() + self.probe_interval
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[Endpoint, float], object], timeout: float) -> object:
+        """
+        Runs `fn(endpoint, seconds_left)` on the best endpoint, failing over when
+        an endpoint is down. `timeout` bounds the whole call: waiting for a slot
+        plus every attempt, so `fn` must not take longer than `seconds_left`.
+        """
+        self.probe_due()
+        deadline = time.monotonic() + timeout
+        tried: set = set()
+        last_exc: Optional[Exception] = None
+        reprobed = False
+        while True:
+            try:
+                ep = self._acquire(tried, deadline)
+            except NoHealthyEndpoint:
+                if not reprobed:
+                    # Everything looks down: check now rather than wait out the
+                    # probe interval, since someone is waiting on this answer.
+                    reprobed = True
+                    if any([self.probe(e) for e in self.endpoints if e.base_url not in tried]):
+                        continue
+                if last_exc is not None:
+                    raise last_exc
+                raise
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._release(ep)
+                raise last_exc if last_exc is not None else TimeoutError("AI request timed out")
+            start = time.monotonic()
+            try:
+                result = fn(ep, remaining)
+            except Exception as e:
+                if not _is_down(e):
+                    # Endpoint is up; the request was bad or slow.
+                    self._release(ep)
+                    raise
+                self._release(ep, failed=True)
+                tried.add(ep.base_url)
+                last_exc = e
+                continue
+            self._release(ep, time.monotonic() - start)
+            return result
+
+    def status(self) -> List[dict]:
+        # Keep the health shown in the UI current without blocking the caller.
+        self.probe_due(wait=False)
+        with self._cond:
+            return [
+                {
+                    "base_url": ep.base_url,
+                    "healthy": ep.healthy,
+                    "in_flight": ep.in_flight,
+                    "max_concurrency": ep.max_concurrency,
+                    "ewma_latency": ep.ewma_latency,
+                }
+                for ep in self.endpoints
+            ]
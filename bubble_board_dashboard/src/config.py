@@ -49,6 +49,11 @@ class Settings:
     ai_model: str = "deepseek-r1:7b"
     ai_api_key: str = ""  # some servers ignore this; keep blank if not needed
     ai_timeout_seconds: int = 60
+    # Extra backends: each entry is BASE_URL or BASE_URL|MAX_CONCURRENCY.
+    # Empty means "just ai_base_url", with no concurrency limit.
+    ai_endpoints: List[str] = field(default_factory=list)
+    ai_max_concurrency: int = 1  # per AI_ENDPOINTS entry, unless the entry overrides it; 0 = no limit
+    ai_probe_seconds: int = 30  # how often a down endpoint is re-checked
 
 
 def _normalize_candidate_paths(candidates: List[str]) -> List[str]:
@@ -103,6 +108,9 @@ def load_settings() -> Settings:
     ai_model = os.getenv("AI_MODEL", "deepseek-r1:7b")
     ai_api_key = os.getenv("AI_API_KEY", "")
     ai_timeout = int(os.getenv("AI_TIMEOUT_SECONDS", "60"))
+    ai_endpoints = [e.strip() for e in os.getenv("AI_ENDPOINTS", "").split(",") if e.strip()]
+    ai_max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", "1"))
+    ai_probe_seconds = int(os.getenv("AI_PROBE_SECONDS", "30"))
 
     tickers = os.getenv("TICKERS", "VOO,VOOG,ORCL,PLTR").split(",")
     tickers = [t.strip().upper() for t in tickers if t.strip()]
@@ -120,4 +128,7 @@ def load_settings() -> Settings:
         ai_model=ai_model,
         ai_api_key=ai_api_key,
         ai_timeout_seconds=ai_timeout,
+        ai_endpoints=ai_endpoints,
+        ai_max_concurrency=ai_max_concurrency,
+        ai_probe_seconds=ai_probe_seconds,
     )
@@ -21,8 +21,8 @@ def load_tasks(
         return pd.DataFrame(), f"Spreadsheet not found at: {xlsx_path}"
 
     try:
-        # If sheet_name not provided, pandas reads first sheet by default
-        df = pd.read_excel(path, sheet_name=sheet_name)
+        # If sheet_name not provided, read the first sheet (sheet_name=None would return every sheet as a dict)
+        df = pd.read_excel(path, sheet_name=sheet_name if sheet_name else 0)
     except Exception as e:
         return pd.DataFrame(), f"Failed to read xlsx: {e}"
 
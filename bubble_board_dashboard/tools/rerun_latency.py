@@ -0,0 +1,369 @@
+"""
+End-to-end rerun latency harness for app.py.
+
+Runs the real Streamlit script through `AppTest` against local stand-ins:
+  - a generated projects.xlsx
+  - a stubbed yfinance download (no internet needed)
+  - one or more fake OpenAI-compatible servers with a configurable delay
+
+and prints p50/p95 script-run time per scenario: cold load, refresh tick,
+filter keystroke, opening a card and generating an AI description.
+
+Usage (from the project folder):
+  python tools/rerun_latency.py
+  python tools/rerun_latency.py --rows 200 --runs 30 --sessions 4 --llm-delay 1.5 --llm-servers 2
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import math
+import multiprocessing as mp
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+# Bare-mode caching and AppTest warn on import and on every run; keep the report readable.
+for _name in ("streamlit.runtime.caching.cache_data_api", "streamlit.runtime.scriptrunner_utils.script_run_context"):
+    logging.getLogger(_name).disabled = True
+
+import src.stocks  # noqa: E402
+from src.config import DEFAULT_COLUMNS  # noqa: E402  (also runs load_dotenv before we override env)
+
+
+# ---------------------------------------------------------------------------
+# Stand-ins
+# ---------------------------------------------------------------------------
+
+def make_workbook(path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    today = date.today()
+    categories = ["Home", "Garage", "Garden", "Finance", "Tech", "Health"]
+    statuses = ["Not started", "In progress", "Blocked", "Waiting", "Done"]
+    records = []
+    for i in range(rows):
+        start = today - timedelta(days=rng.randint(0, 120))
+        records.append({
+            "Category": rng.choice(categories),
+            "Project / Item": f"Project {i + 1}",
+            "Current Status": rng.choice(statuses),
+            "Start Date": start,
+            "Target End Date": start + timedelta(days=rng.randint(7, 180)),
+            "Estimated Cost ($)": rng.randint(0, 5000),
+            "Dependencies / Prerequisites": rng.choice(["", "Permit", "Parts", f"Project {rng.randint(1, rows)}"]),
+            "Next Action": f"Next step for project {i + 1}",
+            "Priority": rng.randint(1, 5),
+        })
+    pd.DataFrame(records, columns=DEFAULT_COLUMNS).to_excel(path, index=False)
+
+
+class FakeYFinance:
+    """Mimics the slice of `yfinance.download` that src/stocks.py uses."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def download(self, tickers, period="1d", interval="5m", **kwargs) -> pd.DataFrame:
+        if self.delay:
+            time.sleep(self.delay)
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        points = 78 if period == "1d" else 780
+        idx = pd.date_range(end=pd.Timestamp.now().floor("min"), periods=points, freq="5min")
+        frames = {}
+        for n, t in enumerate(tickers):
+            base = 100.0 + 50 * n
+            frames[t] = pd.DataFrame({"Close": [base + (i % 13) * 0.1 for i in range(points)]}, index=idx)
+        if len(tickers) == 1:
+            return frames[tickers[0]]
+        return pd.concat(frames, axis=1)
+
+
+def start_fake_llm(delay: float, slots: int = 1) -> Tuple[ThreadingHTTPServer, str]:
+    # Like a single desktop GPU: at most `slots` completions are generated at once,
+    # the rest queue up behind them.
+    gate = threading.BoundedSemaphore(max(1, slots))
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _json(self, body: Dict) -> None:
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/v1/models":
+                self._json({"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self.send_error(404)
+                return
+            with gate:
+                time.sleep(delay)
+            self._json({"choices": [{"message": {"role": "assistant", "content": "A fake description.\n\n- Step one\n- Step two"}}]})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+# Each scenario is (prepare, act): `prepare` builds a session up to the state
+# just before the interaction (untimed); `act` is the rerun being measured.
+
+def _new_app(timeout: float) -> AppTest:
+    return AppTest.from_file(str(APP_DIR / "app.py"), default_timeout=timeout)
+
+
+def _find_button(at: AppTest, label: str):
+    for b in at.button:
+        if b.label == label:
+            return b
+    raise LookupError(f"No button labelled {label!r}")
+
+
+def build_scenarios(timeout: float) -> Dict[str, Tuple[Callable[[], AppTest], Callable[[AppTest], None]]]:
+    def fresh() -> AppTest:
+        return _new_app(timeout)
+
+    def loaded() -> AppTest:
+        return _new_app(timeout).run()
+
+    def opened() -> AppTest:
+        at = loaded()
+        at.button(key="open_1").click().run()
+        return at
+
+    return {
+        # Brand-new session with every st.cache_* emptied first.
+        "cold_load": (fresh, lambda at: at.run()),
+        # The <meta refresh> tick reloads the page: a new session on warm caches.
+        "refresh_tick": (fresh, lambda at: at.run()),
+        "filter_keystroke": (loaded, lambda at: at.text_input[0].input(random.choice("pgn2")).run()),
+        "open_card": (loaded, lambda at: at.button(key="open_1").click().run()),
+        "ai_generate": (opened, lambda at: _find_button(at, "Generate / Refresh").click().run()),
+    }
+
+
+def _failed(name: str, at: AppTest) -> bool:
+    # app.py reports most failures (AI call, tickers, spreadsheet) with st.error
+    # rather than raising, so an exception-free run isn't necessarily a good one.
+    if at.exception or at.error:
+        return True
+    if name == "ai_generate":
+        return not any(el.value == "Done." for el in at.success)
+    return False
+
+
+def _clear_caches() -> None:
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_session(
+    names: List[str],
+    runs: int,
+    timeout: float,
+    yahoo_delay: float,
+    barrier=None,
+) -> Dict[str, Tuple[List[float], int]]:
+    """
+    Plays every scenario in `names` `runs` times in this process.
+    Returns {scenario: (seconds per successful run, failed runs)}; a run fails if
+    preparing or acting raises, or the page ends up showing an error.
+    `barrier` lines up the timed rerun with the other concurrent sessions.
+    """
+    src.stocks.yf = FakeYFinance(yahoo_delay)
+    scenarios = build_scenarios(timeout)
+
+    # Warm caches once so only cold_load pays for the first fetch.
+    _new_app(timeout).run()
+
+    out: Dict[str, Tuple[List[float], int]] = {}
+    for name in names:
+        prepare, act = scenarios[name]
+        timings: List[float] = []
+        errors = 0
+        for _ in range(runs):
+            if name == "cold_load":
+                _clear_caches()
+            try:
+                at: Optional[AppTest] = prepare()
+            except Exception:
+                at = None
+            # Wait even if prepare failed so the other sessions aren't left at the barrier.
+            if barrier is not None:
+                barrier.wait()
+            if at is None:
+                errors += 1
+                continue
+            t0 = time.perf_counter()
+            try:
+                act(at)
+                failed = _failed(name, at)
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - t0
+            if failed:
+                # A fast error page would only flatter the percentiles.
+                errors += 1
+            else:
+                timings.append(elapsed)
+        out[name] = (timings, errors)
+    return out
+
+
+def _session_process(queue, barrier, *args) -> None:
+    try:
+        queue.put(run_session(*args, barrier=barrier))
+    except BaseException as e:
+        # Don't leave the other sessions stuck at the barrier.
+        barrier.abort()
+        queue.put(e)
+
+
+def run_concurrent(
+    sessions: int,
+    names: List[str],
+    runs: int,
+    timeout: float,
+    yahoo_delay: float,
+) -> Dict[str, Tuple[List[float], int]]:
+    """
+    Runs `sessions` sessions side by side and merges their timings.
+
+    AppTest swaps a process-global Runtime on every run, so concurrent sessions
+    can't share a process: each one gets its own, which also means its own
+    st.cache_* and AI pool. They do share the fake LLM servers, whose slot
+    limit is where the contention that matters (the GPU) shows up.
+    """
+    if sessions <= 1:
+        return run_session(names, runs, timeout, yahoo_delay)
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    barrier = ctx.Barrier(sessions)
+    procs = [
+        ctx.Process(target=_session_process, args=(queue, barrier, names, runs, timeout, yahoo_delay))
+        for _ in range(sessions)
+    ]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        raise failures[0]
+
+    merged: Dict[str, Tuple[List[float], int]] = {}
+    for name in names:
+        timings = [t for r in results for t in r[name][0]]
+        errors = sum(r[name][1] for r in results)
+        merged[name] = (timings, errors)
+    return merged
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    # Nearest-rank percentile; fine for the handful of samples we take.
+    ordered = sorted(values)
+    k = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, default=60, help="tasks in the generated workbook")
+    p.add_argument("--runs", type=int, default=10, help="measured reruns per scenario (per session)")
+    p.add_argument("--sessions", type=int, default=1, help="concurrent sessions (one process each)")
+    p.add_argument("--llm-delay", type=float, default=0.5, help="fake LLM response delay (s)")
+    p.add_argument("--llm-servers", type=int, default=1, help="fake LLM servers (fed to AI_ENDPOINTS)")
+    p.add_argument("--llm-slots", type=int, default=1, help="completions each fake LLM serves at once")
+    p.add_argument("--yahoo-delay", type=float, default=0.0, help="stubbed yfinance download delay (s)")
+    p.add_argument("--tickers", default="VOO,VOOG,ORCL,PLTR")
+    p.add_argument("--timeout", type=float, default=60.0, help="per-rerun AppTest timeout (s)")
+    p.add_argument("--scenario", action="append", help="only run this scenario (repeatable)")
+    args = p.parse_args(argv)
+
+    known = list(build_scenarios(args.timeout))
+    selected = args.scenario or known
+    unknown = [s for s in selected if s not in known]
+    if unknown:
+        p.error(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(known)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = Path(tmp) / "projects.xlsx"
+        make_workbook(xlsx, args.rows)
+
+        servers = [start_fake_llm(args.llm_delay, args.llm_slots) for _ in range(max(1, args.llm_servers))]
+        urls = [u for _, u in servers]
+
+        # Session processes inherit this environment.
+        os.environ.pop("BUBBLE_SHEET", None)
+        os.environ.update({
+            "BUBBLE_XLSX_PATH": str(xlsx),
+            "TICKERS": args.tickers,
+            "AI_BASE_URL": urls[0],
+            "AI_ENDPOINTS": ",".join(urls),
+            "AI_MODEL": "fake-model",
+            "AI_MAX_CONCURRENCY": str(max(1, args.llm_slots)),
+        })
+
+        print(
+            f"rows={args.rows} runs={args.runs} sessions={args.sessions} llm_delay={args.llm_delay}s "
+            f"llm_servers={len(urls)}x{args.llm_slots} yahoo_delay={args.yahoo_delay}s"
+        )
+        try:
+            results = run_concurrent(args.sessions, selected, args.runs, args.timeout, args.yahoo_delay)
+        finally:
+            for server, _ in servers:
+                server.shutdown()
+
+    print(f"{'scenario':<18}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'errors':>8}")
+    for name in selected:
+        timings, errors = results[name]
+        ms = [t * 1000 for t in timings]
+        if not ms:
+            print(f"{name:<18}{0:>5}{'—':>10}{'—':>10}{'—':>10}{errors:>8}")
+            continue
+        print(
+            f"{name:<18}{len(ms):>5}{_percentile(ms, 50):>10.1f}{_percentile(ms, 95):>10.1f}"
+            f"{statistics.fmean(ms):>10.1f}{errors:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())